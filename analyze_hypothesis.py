@@ -1,16 +1,17 @@
 import os
 import json
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 from pathlib import Path
-import hashlib
+from report import hash_response
 
 base_log_dir = Path("./experiment_logs")
 output_dir = Path("./analysis_output")
 
-def load_all_logs(api_name, mode):
+def load_all_logs(api_name, mode, log_root=base_log_dir):
     logs = []
-    log_dir = base_log_dir / api_name / mode
+    log_dir = Path(log_root) / api_name / mode
     if not log_dir.exists():
         print(f"Directory not found: {log_dir}")
         return pd.DataFrame()
@@ -24,16 +25,11 @@ def load_all_logs(api_name, mode):
                     continue
     return pd.DataFrame(logs)
 
-def hash_response(text):
-    if not text:
-        return "empty"
-    return hashlib.md5(text.encode("utf-8", errors="ignore")).hexdigest()
-
-def analyze_logs_extended(df, api_name, mode):
+def analyze_logs_extended(df, api_name, mode, output_root=output_dir):
     if df.empty:
         return
 
-    output_path = output_dir / api_name / mode
+    output_path = Path(output_root) / api_name / mode
     os.makedirs(output_path, exist_ok=True)
 
     df["__endpoint"] = df["original_request"].apply(lambda x: x.get("endpoint") if isinstance(x, dict) else None)
@@ -113,12 +109,14 @@ def analyze_logs_extended(df, api_name, mode):
     reward_by_mutator.to_csv(output_path / "reward_by_mutator.csv")
     error_by_endpoint.to_csv(output_path / "errors_by_endpoint.csv")
 
-api_name = "crapi"
-mode = "heuristic"  # classic / heuristic / rl
+def run_analysis(api_name, mode, log_root=base_log_dir, output_root=output_dir):
+    print(f"\nAnalysis: {api_name.upper()} [{mode.upper()}]")
+    matplotlib.use("Agg")  # headless rendering; selected here so importing the module changes no global state
 
-print(f"\nAnalysis: {api_name.upper()} [{mode.upper()}]")
+    df_logs = load_all_logs(api_name, mode, log_root)
+    analyze_logs_extended(df_logs, api_name, mode, output_root)
 
-df_logs = load_all_logs(api_name, mode)
-analyze_logs_extended(df_logs, api_name, mode)
+    print(f"Charts and tables saved in: {Path(output_root) / api_name / mode}")
 
-print(f"Charts and tables saved in: {output_dir / api_name / mode}")
+if __name__ == "__main__":
+    run_analysis("crapi", "heuristic")  # classic / heuristic / rl
@@ -2,25 +2,31 @@ import requests
 import random
 import json
 import logging
+import os
 from datetime import datetime
 import string
 import io
 from urllib.parse import urlparse
 
-log_id = "full_crapi"
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-log_filename = f"fuzz_log_{log_id}_{timestamp}.jsonl"
-
-logging.basicConfig(
-    filename=log_filename,
-    filemode="a",
-    level=logging.INFO,
-    format='%(message)s'
-)
-
 #API_URL = "http://localhost:8888" # crAPI
 API_URL = "http://localhost:8080/api/v3" # petstore
 # API_URL = "http://localhost:8010/v2" # languagetool
+PAYLOADS_DIR = "../PayloadsAllTheThings"
+
+BODY_MUTATORS = {
+    "mutate_string",
+    "remove_field",
+    "duplicate_field",
+    "set_large_value",
+    "inject_sql_payload",
+    "type_flip",
+    "set_empty_values",
+    "flip_boolean_flags",
+    "fuzz_ids",
+    "mutate_template_injection",
+    "mutate_content_type_vs_body"
+}
+FUZZ_ID_KEYS = ["id", "userId", "vehicleId", "video_id", "order_id", "postId"]
 
 def extract_path(url):
     try:
@@ -36,8 +42,45 @@ def generate_fuzzed_file_payload(payload: str) -> dict:
         "file": (file_obj.name, file_obj, "text/plain")
     }
 
+def perform_request(request_data, token=None, session=requests, timeout=None):
+    try:
+        method = request_data.get("method", "GET").upper()
+        url = request_data.get("url")
+        headers = request_data.get("headers", {}) or {}
+        body = request_data.get("body", None)
+        if headers.get("Content-Type", "").strip() in ["application/", ""]:
+            headers["Content-Type"] = "application/json"
+        if token:
+            if "Authorization" not in headers or "YOUR_ACCESS_TOKEN" in headers.get("Authorization", ""):
+                headers["Authorization"] = f"Bearer {token}"
+        if method == "GET":
+            return session.get(url, headers=headers, timeout=timeout)
+        elif method == "POST":
+            if headers.get("Content-Type") == "multipart/form-data":
+                files = generate_fuzzed_file_payload(str(body.get("file", "FUZZ")))
+                clean_headers = {k: v for k, v in headers.items() if k != "Content-Type"}
+                return session.post(url, headers=clean_headers, files=files, timeout=timeout)
+            else:
+                return session.post(url, headers=headers, json=body, timeout=timeout)
+        elif method == "PUT":
+            return session.put(url, headers=headers, json=body, timeout=timeout)
+        elif method == "DELETE":
+            return session.delete(url, headers=headers, timeout=timeout)
+        else:
+            response = requests.Response()
+            response.status_code = 405
+            response._content = b"Unsupported HTTP method"
+            return response
+    except Exception as e:
+        print(f"Request failed: {e}")
+        response = requests.Response()
+        response.status_code = 0
+        response._content = str(e).encode()
+        return response
+
 class APIFuzzEnv:
-    def __init__(self, templates_path="./input_templates_petstore_new.json", use_auth=True, log_file_path = None, use_endpoint_scores=False):
+    def __init__(self, templates_path="./input_templates_petstore_new.json", use_auth=True, log_file_path = None, use_endpoint_scores=False,
+                 api_url=API_URL, token=None, payloads_dir=PAYLOADS_DIR):
         with open(templates_path, "r", encoding="utf-8") as f:
             self.templates = json.load(f)
         self.use_endpoint_scores = use_endpoint_scores
@@ -47,7 +90,8 @@ class APIFuzzEnv:
         self.current_step = 0
         self.log_file_path = log_file_path
         self.logger = logging.getLogger(f"FuzzLog_{log_file_path}")
-        if log_file_path:
+        self.logger.propagate = False
+        if log_file_path and not self.logger.handlers:
             handler = logging.FileHandler(log_file_path)
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
@@ -92,20 +136,20 @@ class APIFuzzEnv:
             "mutate_url_path": "path/query"
         }
 
+        self.payloads_dir = payloads_dir
         self.load_all_payloads()
-        
-        if use_auth:
-            self.token = "tested API token" # fill if you need an Authorization
+
+        self.token = (token or os.environ.get("FUZZ_API_TOKEN")) if use_auth else None
 
         for template in self.templates:
             url = template["url"]
             endpoint = template.get("endpoint", url)
             if url.startswith("/"):
-                template["url"] = f"{API_URL}{url}"
+                template["url"] = f"{api_url}{url}"
             elif url.startswith("api.example.com"):
                 template["url"] = f"https://{url}"
             elif url.startswith("https://api.example.com"):
-                template["url"] = url.replace("https://api.example.com", API_URL)
+                template["url"] = url.replace("https://api.example.com", api_url)
 
             if self.token:
                 headers = template.setdefault("headers", {})
@@ -113,11 +157,75 @@ class APIFuzzEnv:
 
 
             self.endpoint_scores[endpoint] = 1
+
+        # bit i set <=> mutation_actions[i] can change this template; computed once, keyed by template identity
+        self.action_masks = {id(t): self.compute_action_mask(t) for t in self.templates}
+
+    def _body_dicts(self, template):
+        body = template.get("body")
+        if isinstance(body, dict):
+            return [body]
+        if isinstance(body, list):
+            return [item for item in body if isinstance(item, dict)]
+        return []
+
+    def _is_applicable(self, name, template):
+        method = template.get("method", "GET").upper()
+        url = template.get("url", "")
+        if name in BODY_MUTATORS:
+            if template.get("body") is None or method == "GET":
+                return False
+            values = [v for d in self._body_dicts(template) for v in d.values()]
+            keys = [k for d in self._body_dicts(template) for k in d]
+            if name == "mutate_string":
+                return bool(self.xss_payloads) and any(isinstance(v, str) and v for v in values)
+            if name == "inject_sql_payload":
+                return bool(self.sql_payloads) and any(isinstance(v, str) for v in values)
+            if name == "mutate_template_injection":
+                return bool(self.ssti_payloads) and any(isinstance(v, str) for v in values)
+            if name == "set_large_value":
+                return any(isinstance(v, (int, float)) for v in values)
+            if name == "type_flip":
+                return any(isinstance(v, int) or (isinstance(v, str) and v.strip().lstrip("+-").isdigit()) for v in values)
+            if name == "flip_boolean_flags":
+                return any(isinstance(v, bool) for v in values)
+            if name == "fuzz_ids":
+                return any(k in FUZZ_ID_KEYS for k in keys)
+            if name == "mutate_content_type_vs_body":
+                # the mutator writes req["headers"]["Content-Type"], so it needs a headers dict to exist
+                return isinstance(template.get("body"), dict) and isinstance(template.get("headers"), dict)
+            return bool(keys)  # remove_field, duplicate_field, set_empty_values
+        if name == "mutate_headers":
+            return bool(template.get("headers"))
+        if name == "mutate_url_path":
+            return len(url.split("/")) > 3
+        if name == "mutate_query_values":
+            query = url.split("?", 1)[1] if "?" in url else ""
+            return bool(self.xss_payloads) and any("=" in p and p.split("=", 1)[1] for p in query.split("&"))
+        if name == "mutate_path_ids":
+            return any(part.isdigit() for part in url.split("/"))
+        return True  # mutate_query_params, mutate_method
+
+    def compute_action_mask(self, template):
+        mask = 0
+        for i, action in enumerate(self.mutation_actions):
+            if self._is_applicable(action.__name__, template):
+                mask |= 1 << i
+        return mask
+
+    def get_action_mask(self, template=None):
+        template = template if template is not None else self.current_template
+        mask = self.action_masks.get(id(template))
+        return mask if mask is not None else self.compute_action_mask(template)
+
+    def valid_actions(self, template=None):
+        mask = self.get_action_mask(template)
+        return [i for i in range(len(self.mutation_actions)) if mask >> i & 1]
             
     def load_all_payloads(self):
-        self.sql_payloads = self._load_payloads("../PayloadsAllTheThings/SQL Injection/Intruder/Generic_Fuzz.txt")
-        self.xss_payloads = self._load_payloads("../PayloadsAllTheThings/XSS Injection/Intruders/XSS_Polyglots.txt")
-        self.ssti_payloads = self._load_payloads("..PayloadsAllTheThings/Server Side Template Injection/Intruder/ssti.fuzz")
+        self.sql_payloads = self._load_payloads(os.path.join(self.payloads_dir, "SQL Injection/Intruder/Generic_Fuzz.txt"))
+        self.xss_payloads = self._load_payloads(os.path.join(self.payloads_dir, "XSS Injection/Intruders/XSS_Polyglots.txt"))
+        self.ssti_payloads = self._load_payloads(os.path.join(self.payloads_dir, "Server Side Template Injection/Intruder/ssti.fuzz"))
 
     def _load_payloads(self, path):
         try:
@@ -137,6 +245,7 @@ class APIFuzzEnv:
 
     def step(self, action_index):
         
+        action_mask = self.get_action_mask()
         if random.random() < 0.3:
             mutated = self.apply_multiple_mutations(self.current_template, count=random.randint(2, 3))
         else:
@@ -163,6 +272,8 @@ class APIFuzzEnv:
             "action_index": action_index,
             "action_name": self.mutation_actions[action_index].__name__,
             "mutation_type": self.mutator_types.get(self.mutation_actions[action_index].__name__, "unknown"),
+            "action_mask": action_mask,
+            "action_valid": bool(action_mask >> action_index & 1),
             "status_code": mutated_response.status_code,
             "reward": reward,
             "mutation_applied": self.is_mutated(self.current_template, mutated),
@@ -183,20 +294,7 @@ class APIFuzzEnv:
         mutation = self.mutation_actions[action_index]
         method = template.get("method", "GET").upper()
         body = template.get("body", None)
-        body_mutators = {
-            "mutate_string",
-            "remove_field",
-            "duplicate_field",
-            "set_large_value",
-            "inject_sql_payload",
-            "type_flip",
-            "set_empty_values",
-            "flip_boolean_flags",
-            "fuzz_ids",
-            "mutate_template_injection",
-            "mutate_content_type_vs_body"
-        }
-        if mutation.__name__ in body_mutators and (body is None or method == "GET"):
+        if mutation.__name__ in BODY_MUTATORS and (body is None or method == "GET"):
             return mutated
         mutation(mutated)
         return mutated
@@ -218,40 +316,7 @@ class APIFuzzEnv:
         return 0
     
     def send_request(self, request_data):
-        try:
-            method = request_data.get("method", "GET").upper()
-            url = request_data.get("url")
-            headers = request_data.get("headers", {}) or {}
-            body = request_data.get("body", None)
-            if headers.get("Content-Type", "").strip() in ["application/", ""]:
-                headers["Content-Type"] = "application/json"
-            if self.token:
-                if "Authorization" not in headers or "YOUR_ACCESS_TOKEN" in headers.get("Authorization", ""):
-                    headers["Authorization"] = f"Bearer {self.token}"
-            if method == "GET":
-                return requests.get(url, headers=headers)
-            elif method == "POST":
-                if headers.get("Content-Type") == "multipart/form-data":
-                    files = generate_fuzzed_file_payload(str(body.get("file", "FUZZ")))
-                    clean_headers = {k: v for k, v in headers.items() if k != "Content-Type"}
-                    return requests.post(url, headers=clean_headers, files=files)
-                else:
-                    return requests.post(url, headers=headers, json=body)
-            elif method == "PUT":
-                return requests.put(url, headers=headers, json=body)
-            elif method == "DELETE":
-                return requests.delete(url, headers=headers)
-            else:
-                response = requests.Response()
-                response.status_code = 405
-                response._content = b"Unsupported HTTP method"
-                return response
-        except Exception as e:
-            print(f"Request failed: {e}")
-            response = requests.Response()
-            response.status_code = 0
-            response._content = str(e).encode()
-            return response
+        return perform_request(request_data, self.token)
 ### MUTATIONS
     def mutate_string(self, req):
         def mutate(d):
@@ -354,11 +419,10 @@ class APIFuzzEnv:
         self._mutate_body(req, mutate)
 
     def fuzz_ids(self, req):
-        common_ids = ["id", "userId", "vehicleId", "video_id", "order_id", "postId"]
         fuzz_values = [-1, 0, 999999999, "abc", "0'*", "../../../etc/passwd", "", " "]
         def mutate(d):
             for key in d:
-                if key in common_ids:
+                if key in FUZZ_ID_KEYS:
                     d[key] = random.choice(fuzz_values)
                     break
         self._mutate_body(req, mutate)
@@ -384,7 +448,8 @@ class APIFuzzEnv:
 
     def apply_multiple_mutations(self, template, count=2):
         mutated = json.loads(json.dumps(template))
-        actions = random.sample(self.mutation_actions, count)
+        valid = [self.mutation_actions[i] for i in self.valid_actions(template)]
+        actions = random.sample(valid, min(count, len(valid)))
         for action in actions:
             try:
                 action(mutated)
@@ -0,0 +1,68 @@
+import os
+import random
+import subprocess
+import sys
+import time
+
+SUBSYSTEMS = ["config", "q_learning_agent", "api_fuzz_env", "analyze_hypothesis", "gpt_parser"]
+
+def bench_imports():
+    # each import is timed in a fresh interpreter so module caches don't hide the cost
+    results = {}
+    for module in SUBSYSTEMS:
+        code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+        results[module] = float(proc.stdout.strip()) if proc.returncode == 0 else None
+    return results
+
+def bench_mutations(env, iterations):
+    # same mutation mix as fuzzing: only actions in each template's applicability mask
+    failed = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        template = random.choice(env.templates)
+        try:
+            env.apply_mutation(template, random.choice(env.valid_actions(template)))
+        except Exception:
+            failed += 1
+    return iterations / (time.perf_counter() - start), failed
+
+def bench_agent(n_actions, iterations):
+    from q_learning_agent import QLearningAgent
+    agent = QLearningAgent(n_actions=n_actions)
+    states = [f"state_{i}" for i in range(100)]
+    start = time.perf_counter()
+    for i in range(iterations):
+        state = states[i % len(states)]
+        action = agent.select_action(state)
+        agent.update(state, action, random.choice([-1, 0, 1]), states[(i + 1) % len(states)])
+    return iterations / (time.perf_counter() - start)
+
+def bench_agent_batched(n_actions, iterations, n_envs=32):
+    import numpy as np
+    from q_learning_agent import QLearningAgent
+    agent = QLearningAgent(n_actions=n_actions, replay_capacity=10000)
+    states = [f"state_{i}" for i in range(100 + n_envs)]
+    start = time.perf_counter()
+    for i in range(iterations // n_envs):
+        batch = states[i % 100:i % 100 + n_envs]
+        actions = agent.select_actions(batch)
+        agent.update_batch(batch, actions, np.random.choice([-1, 0, 1], size=n_envs), states[i % 100 + 1:i % 100 + n_envs + 1])
+    return (iterations // n_envs) * n_envs / (time.perf_counter() - start)
+
+def run_bench(config):
+    iterations = config["bench"]["iterations"]
+    fuzz_cfg = config["fuzz"]
+
+    print("\n⏱️ Import time per subsystem:")
+    for module, seconds in bench_imports().items():
+        print(f"  {module}: {'failed' if seconds is None else f'{seconds * 1000:.1f} ms'}")
+
+    from api_fuzz_env import APIFuzzEnv
+    env = APIFuzzEnv(templates_path=fuzz_cfg["templates_path"], use_auth=False, api_url=fuzz_cfg["api_url"],
+                     payloads_dir=fuzz_cfg["payloads_dir"])
+    rate, failed = bench_mutations(env, iterations)
+    print(f"\n🧬 Mutations (offline): {rate:,.0f}/s, {failed} failed")
+    print(f"🤖 Q-learning select+update: {bench_agent(len(env.mutation_actions), iterations):,.0f}/s")
+    print(f"🤖 Batched Q-learning (32 envs, replay): {bench_agent_batched(len(env.mutation_actions), iterations):,.0f} transitions/s")
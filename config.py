@@ -0,0 +1,83 @@
+import json
+import copy
+import os
+
+DEFAULT_CONFIG_FILE = "fuzz_config.json"
+
+DEFAULT_CONFIG = {
+    "generate": {
+        "openapi_file": "language_tool.json",
+        "output_file": "input_templates_language_tool.json",
+        "model": "gpt-4o",
+        "api_key": None  # falls back to OPENAI_API_KEY
+    },
+    "fuzz": {
+        "api_name": "petstore-localhost",
+        "mode": "classic",  # "classic", "heuristic", "rl"
+        "api_url": "http://localhost:8080/api/v3",  # crAPI: http://localhost:8888, languagetool: http://localhost:8010/v2
+        "templates_path": "./input_templates_petstore_new.json",
+        "payloads_dir": "../PayloadsAllTheThings",
+        "use_auth": False,
+        "token": None,  # falls back to FUZZ_API_TOKEN
+        "use_endpoint_scores": False,
+        "episodes": 300,
+        "steps_per_episode": 10,
+        "repeats": 10,
+        "parallel_envs": 1,  # >1: batched agents over K concurrent envs
+        "replay_capacity": 10000,  # batched mode only; 0 disables experience replay
+        "replay_batch_size": 32,
+        "log_dir": "./experiment_logs"
+    },
+    "analyze": {
+        "api_name": "crapi",
+        "mode": "heuristic",  # classic / heuristic / rl
+        "log_dir": "./experiment_logs",
+        "output_dir": "./analysis_output"
+    },
+    "report": {
+        "log_dir": "./experiment_logs",
+        "output_dir": "./analysis_output",
+        "workers": None  # defaults to the CPU count
+    },
+    "stats": {
+        "log_dir": "./experiment_logs",
+        "output_dir": "./analysis_output",
+        "n_resamples": 20000,
+        "alpha": 0.05,
+        "seed": None,
+        "workers": None
+    },
+    "replay": {
+        "log_dir": "./experiment_logs",
+        "output_dir": "./analysis_output",
+        "api_name": None,  # None = all APIs under log_dir
+        "mode": None,  # None = all modes
+        "target": None,  # e.g. http://localhost:8888 to replay against another host; None = logged URLs
+        "token": None,  # falls back to FUZZ_API_TOKEN
+        "workers": 32,
+        "timeout": 10
+    },
+    "bench": {
+        "iterations": 10000
+    }
+}
+
+
+def _merge(base, override):
+    for key, val in override.items():
+        if isinstance(val, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], val)
+        else:
+            base[key] = val
+    return base
+
+
+def load_config(path=None):
+    """Returns DEFAULT_CONFIG overlaid with the JSON file at `path` (or fuzz_config.json if present)."""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path is None:
+        if not os.path.exists(DEFAULT_CONFIG_FILE):
+            return config
+        path = DEFAULT_CONFIG_FILE
+    with open(path, "r", encoding="utf-8") as f:
+        return _merge(config, json.load(f))
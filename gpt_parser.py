@@ -1,15 +1,23 @@
 import json
-from typing import List
-from openai import OpenAI
+import os
+from typing import List, Optional
 
-CLIENT = OpenAI(api_key="gpt api token here")
 OPENAPI_FILE = "language_tool.json"
 OUTPUT_FILE = "input_templates_language_tool.json"
 MODEL = "gpt-4o"
 
-def call_gpt(prompt: str) -> str:
-    response = CLIENT.chat.completions.create(
-        model=MODEL,
+_client = None
+
+def get_client(api_key: Optional[str] = None):
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+    return _client
+
+def call_gpt(prompt: str, model: str = MODEL) -> str:
+    response = get_client().chat.completions.create(
+        model=model,
         messages=[
             {"role": "system", "content": "You are an expert in generating test input templates for REST APIs."},
             {"role": "user", "content": prompt}
@@ -42,8 +50,9 @@ def validate_template(template: dict) -> List[str]:
 
     return errors
 
-def generate_templates():
-    with open(OPENAPI_FILE, "r", encoding="utf-8") as f:
+def generate_templates(openapi_file: str = OPENAPI_FILE, output_file: str = OUTPUT_FILE, model: str = MODEL, api_key: Optional[str] = None):
+    get_client(api_key)
+    with open(openapi_file, "r", encoding="utf-8") as f:
         spec = json.load(f)
 
     paths = spec.get("paths", {})
@@ -85,7 +94,7 @@ OpenAPI operation:
 {json.dumps(short_operation, indent=2)}
 '''
             try:
-                gpt_output = call_gpt(gen_prompt)
+                gpt_output = call_gpt(gen_prompt, model)
                 cleaned = gpt_output.strip().strip("```").replace("json", "").strip()
                 parsed = json.loads(cleaned)
                 errors = validate_template(parsed)
@@ -104,7 +113,7 @@ Return valid JSON only.
 Broken template:
 {json.dumps(parsed, indent=2)}
 '''
-                    corrected_response = call_gpt(fix_prompt)
+                    corrected_response = call_gpt(fix_prompt, model)
                     try:
                         corrected = json.loads(corrected_response)
                         corrected_errors = validate_template(corrected)
@@ -121,9 +130,9 @@ Broken template:
             except Exception as e:
                 print(f"❌ GPT generation failed: {e}")
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+    with open(output_file, "w", encoding="utf-8") as f:
         json.dump(generated_templates, f, indent=2)
-        print(f"\n📦 Saved {len(generated_templates)} valid templates to {OUTPUT_FILE}")
+        print(f"\n📦 Saved {len(generated_templates)} valid templates to {output_file}")
 
     print("\n📊 Distribution of methods in spec:")
     for m, count in method_counter.items():
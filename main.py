@@ -1,26 +1,33 @@
+import argparse
 import os
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from api_fuzz_env import APIFuzzEnv
-from q_learning_agent import QLearningAgent
+from config import load_config
 
-# Parameters
-episodes = 300
-steps_per_episode = 10
-repeats = 10
-base_log_dir = "./experiment_logs"
+# Subsystems (api_fuzz_env/requests, q_learning_agent/numpy, analyze_hypothesis/pandas+matplotlib,
+# gpt_parser/openai) are imported inside the subcommand that needs them, so startup stays cheap.
 
-def get_log_path(api_name, mode, run_id):
+def get_log_path(base_log_dir, api_name, mode, run_id):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     dir_path = os.path.join(base_log_dir, api_name, mode)
     os.makedirs(dir_path, exist_ok=True)
     return os.path.join(dir_path, f"run_{run_id}_{timestamp}.jsonl")
 
-def run_experiment(api_name, mode, run_id):
-    log_path = get_log_path(api_name, mode, run_id)
+def run_experiment(cfg, run_id):
+    from api_fuzz_env import APIFuzzEnv
+    from q_learning_agent import QLearningAgent
+
+    api_name = cfg["api_name"]
+    mode = cfg["mode"]
+    episodes = cfg["episodes"]
+    steps_per_episode = cfg["steps_per_episode"]
+    log_path = get_log_path(cfg["log_dir"], api_name, mode, run_id)
 
     #use_scores = True if mode == "heuristic" else False
-    env = APIFuzzEnv(use_auth=False, log_file_path=log_path, use_endpoint_scores=False)
+    env = APIFuzzEnv(templates_path=cfg["templates_path"], use_auth=cfg["use_auth"], log_file_path=log_path,
+                     use_endpoint_scores=cfg["use_endpoint_scores"], api_url=cfg["api_url"], token=cfg["token"],
+                     payloads_dir=cfg["payloads_dir"])
     mutation_agent = QLearningAgent(n_actions=len(env.mutation_actions)) if mode != "classic" else None
     endpoint_agent = QLearningAgent(n_actions=len(env.templates)) if mode == "rl" else None
 
@@ -39,9 +46,9 @@ def run_experiment(api_name, mode, run_id):
 
         for step in range(steps_per_episode):
             if mode == "classic":
-                action = random.randint(0, len(env.mutation_actions) - 1)
+                action = random.choice(env.valid_actions())
             else:
-                action = mutation_agent.select_action(state)
+                action = mutation_agent.select_action(state, env.get_action_mask())
             env.current_run = run_id
             env.current_episode = ep
             env.current_step = step
@@ -49,7 +56,7 @@ def run_experiment(api_name, mode, run_id):
             next_template, reward, done, info = env.step(action)
             next_state = f"{next_template['method']}:{next_template['url']}:{info['status_code']}"
             if mode != "classic":
-                mutation_agent.update(state, action, reward, next_state)
+                mutation_agent.update(state, action, reward, next_state, env.get_action_mask())
             if mode == "rl":
                 endpoint_reward = 1 if reward >= 0.5 else -1
                 endpoint_agent.update(endpoint_state, template_index, endpoint_reward, endpoint_state)
@@ -58,13 +65,186 @@ def run_experiment(api_name, mode, run_id):
                 break
             state = next_state
 
-def main():
-    api_name = "petstore-localhost"
-    mode = "classic"  # "classic", "heuristic", "rl"
+def run_experiment_batched(cfg, run_id):
+    """Like run_experiment, but K = parallel_envs envs step concurrently and the agents learn from batches."""
+    from api_fuzz_env import APIFuzzEnv
+    from q_learning_agent import QLearningAgent
+
+    mode = cfg["mode"]
+    episodes = cfg["episodes"]
+    n_envs = cfg["parallel_envs"]
+    log_path = get_log_path(cfg["log_dir"], cfg["api_name"], mode, run_id)
+
+    envs = [APIFuzzEnv(templates_path=cfg["templates_path"], use_auth=cfg["use_auth"], log_file_path=log_path,
+                       use_endpoint_scores=cfg["use_endpoint_scores"], api_url=cfg["api_url"], token=cfg["token"],
+                       payloads_dir=cfg["payloads_dir"]) for _ in range(n_envs)]
+    n_actions = len(envs[0].mutation_actions)
+    n_templates = len(envs[0].templates)
+    replay = {"replay_capacity": cfg["replay_capacity"], "replay_batch_size": cfg["replay_batch_size"]}
+    mutation_agent = QLearningAgent(n_actions=n_actions, **replay) if mode != "classic" else None
+    endpoint_agent = QLearningAgent(n_actions=n_templates, **replay) if mode == "rl" else None
+
+    with ThreadPoolExecutor(max_workers=n_envs) as pool:
+        # env k plays episodes first_ep + k, so episode numbers in the shared log stay unique
+        for first_ep in range(0, episodes, n_envs):
+            batch = envs[:min(n_envs, episodes - first_ep)]
+            if mode == "rl":
+                endpoint_states = []
+                for env in batch:
+                    endpoint_state_template = random.choice(env.templates)
+                    endpoint_states.append(endpoint_state_template.get('endpoint', endpoint_state_template['url']))
+                template_indices = endpoint_agent.select_actions(endpoint_states)
+                for env, template_index in zip(batch, template_indices):
+                    env.current_template = env.templates[template_index]
+            else:
+                for env in batch:
+                    env.current_template = random.choice(env.templates)
+
+            states = [f"{env.current_template['method']}:{env.current_template['url']}:start" for env in batch]
+            active = list(range(len(batch)))
 
+            for step in range(cfg["steps_per_episode"]):
+                # each env keeps mutating current_template, so this is also the next state's mask
+                masks = [batch[i].get_action_mask() for i in active]
+                if mode == "classic":
+                    actions = [random.choice(batch[i].valid_actions()) for i in active]
+                else:
+                    actions = mutation_agent.select_actions([states[i] for i in active], masks)
+                for i in active:
+                    batch[i].current_run = run_id
+                    batch[i].current_episode = first_ep + i
+                    batch[i].current_step = step
+
+                results = list(pool.map(lambda i, action: batch[i].step(int(action)), active, actions))
+                next_states = [f"{t['method']}:{t['url']}:{info['status_code']}" for t, _, _, info in results]
+                rewards = [reward for _, reward, _, _ in results]
+                if mode != "classic":
+                    mutation_agent.update_batch([states[i] for i in active], actions, rewards, next_states, masks)
+                if mode == "rl":
+                    endpoint_rewards = [1 if reward >= 0.5 else -1 for reward in rewards]
+                    active_endpoints = [endpoint_states[i] for i in active]
+                    endpoint_agent.update_batch(active_endpoints, [template_indices[i] for i in active],
+                                                endpoint_rewards, active_endpoints)
+
+                still_active = []
+                for i, next_state, (_, _, done, _) in zip(active, next_states, results):
+                    if not done:
+                        states[i] = next_state
+                        still_active.append(i)
+                active = still_active
+                if not active:
+                    break
+
+def cmd_generate(config):
+    from gpt_parser import generate_templates
+    cfg = config["generate"]
+    generate_templates(cfg["openapi_file"], cfg["output_file"], cfg["model"], cfg["api_key"])
+
+def cmd_fuzz(config):
+    cfg = config["fuzz"]
+    repeats = cfg["repeats"]
     for run_id in range(repeats):
-        print(f"\n🚀 Start run {run_id + 1}/{repeats} [{mode.upper()}]")
-        run_experiment(api_name, mode, run_id)
+        print(f"\n🚀 Start run {run_id + 1}/{repeats} [{cfg['mode'].upper()}]")
+        if cfg["parallel_envs"] > 1:
+            run_experiment_batched(cfg, run_id)
+        else:
+            run_experiment(cfg, run_id)
+
+def cmd_analyze(config):
+    from analyze_hypothesis import run_analysis
+    cfg = config["analyze"]
+    run_analysis(cfg["api_name"], cfg["mode"], cfg["log_dir"], cfg["output_dir"])
+
+def cmd_report(config):
+    from report import build_report
+    cfg = config["report"]
+    build_report(cfg["log_dir"], cfg["output_dir"], cfg["workers"])
+
+def cmd_stats(config):
+    from significance import run_significance
+    cfg = config["stats"]
+    run_significance(cfg["log_dir"], cfg["output_dir"], cfg["n_resamples"], cfg["alpha"], cfg["seed"], cfg["workers"])
+
+def cmd_replay(config):
+    from replay import run_replay
+    cfg = config["replay"]
+    run_replay(cfg["log_dir"], cfg["output_dir"], cfg["api_name"], cfg["mode"], cfg["target"], cfg["token"],
+               cfg["workers"], cfg["timeout"])
+
+def cmd_bench(config):
+    from bench import run_bench
+    run_bench(config)
+
+COMMANDS = {
+    "generate": cmd_generate,
+    "fuzz": cmd_fuzz,
+    "analyze": cmd_analyze,
+    "report": cmd_report,
+    "stats": cmd_stats,
+    "replay": cmd_replay,
+    "bench": cmd_bench
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="RL-guided REST API fuzzer")
+    parser.add_argument("--config", default=None, help="JSON config file (default: ./fuzz_config.json if present)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="generate request templates from an OpenAPI spec with GPT")
+    gen.add_argument("--openapi-file")
+    gen.add_argument("--output-file")
+    gen.add_argument("--model")
+
+    fuzz = sub.add_parser("fuzz", help="run fuzzing experiments against the SUT")
+    fuzz.add_argument("--api-name")
+    fuzz.add_argument("--mode", choices=["classic", "heuristic", "rl"])
+    fuzz.add_argument("--api-url")
+    fuzz.add_argument("--templates-path")
+    fuzz.add_argument("--episodes", type=int)
+    fuzz.add_argument("--steps-per-episode", type=int)
+    fuzz.add_argument("--repeats", type=int)
+    fuzz.add_argument("--parallel-envs", type=int)
+
+    analyze = sub.add_parser("analyze", help="aggregate experiment logs into tables and charts")
+    analyze.add_argument("--api-name")
+    analyze.add_argument("--mode", choices=["classic", "heuristic", "rl"])
+    analyze.add_argument("--log-dir")
+    analyze.add_argument("--output-dir")
+
+    report = sub.add_parser("report", help="cached cross-mode comparison of all APIs and modes under the log dir")
+    report.add_argument("--log-dir")
+    report.add_argument("--output-dir")
+    report.add_argument("--workers", type=int)
+
+    stats = sub.add_parser("stats", help="bootstrap CIs, Mann-Whitney U and effect sizes between modes per API")
+    stats.add_argument("--log-dir")
+    stats.add_argument("--output-dir")
+    stats.add_argument("--n-resamples", type=int)
+    stats.add_argument("--alpha", type=float)
+    stats.add_argument("--seed", type=int)
+    stats.add_argument("--workers", type=int)
+
+    replay = sub.add_parser("replay", help="re-issue unique logged 5xx requests and report which still reproduce")
+    replay.add_argument("--log-dir")
+    replay.add_argument("--output-dir")
+    replay.add_argument("--api-name")
+    replay.add_argument("--mode", choices=["classic", "heuristic", "rl"])
+    replay.add_argument("--target")
+    replay.add_argument("--workers", type=int)
+    replay.add_argument("--timeout", type=float)
+
+    bench = sub.add_parser("bench", help="measure subsystem import time and offline mutation/agent throughput")
+    bench.add_argument("--iterations", type=int)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config(args.config)
+    section = config[args.command]
+    for key, val in vars(args).items():
+        if key not in ("config", "command") and val is not None:
+            section[key] = val
+    COMMANDS[args.command](config)
 
 if __name__ == "__main__":
     main()
@@ -1,29 +1,153 @@
 import numpy as np
 import random
+
+class ReplayBuffer:
+    """Fixed-size ring buffer of (state, action, reward, next_state, next_mask) transitions stored as state indices.
+
+    next_mask is the next state's action bitmask; -1 (all bits set) means every action is valid.
+    """
+    def __init__(self, capacity, seed=None):
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.next_masks = np.full(capacity, -1, dtype=np.int64)
+        self.pos = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add_batch(self, states, actions, rewards, next_states, next_masks):
+        n = len(states)
+        if n >= self.capacity:
+            states, actions, rewards, next_states, next_masks = (
+                x[-self.capacity:] for x in (states, actions, rewards, next_states, next_masks))
+            n = self.capacity
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.next_masks[idx] = next_masks
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size):
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return self.states[idx], self.actions[idx], self.rewards[idx], self.next_states[idx], self.next_masks[idx]
+
 #discount na poczatku bylo 0.95, zmienione na 0.99
 class QLearningAgent:
-    def __init__(self, n_actions, learning_rate=0.1, discount=0.99 , epsilon=1.0, epsilon_decay=0.997, min_epsilon=0.1): #bylo 0.99 i 0.05
-        self.q_table = {}  # dict[state] = np.array[n_actions]
+    def __init__(self, n_actions, learning_rate=0.1, discount=0.99 , epsilon=1.0, epsilon_decay=0.997, min_epsilon=0.1, #bylo 0.99 i 0.05
+                 replay_capacity=None, replay_batch_size=32, seed=None):
+        # Q-values live in one growable array (row per state) so batches of states update in a single NumPy op
+        self.state_index = {}  # dict[state] = row in q_values
+        self.q_values = np.zeros((64, n_actions))
         self.n_actions = n_actions
         self.lr = learning_rate
         self.gamma = discount
+        self.initial_epsilon = epsilon
         self.epsilon = epsilon
         self.epsilon_decay = epsilon_decay
         self.min_epsilon = min_epsilon
+        # epsilon follows the global step (one per update/update_batch call), not the number of transitions,
+        # so running more parallel envs does not speed up the decay
+        self.global_step = 0
+        self.replay = ReplayBuffer(replay_capacity, seed) if replay_capacity else None
+        self.replay_batch_size = replay_batch_size
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def q_table(self):
+        return {state: self.q_values[i] for state, i in self.state_index.items()}
+
+    def epsilon_at(self, step):
+        return max(self.min_epsilon, self.initial_epsilon * self.epsilon_decay ** step)
+
+    def _index(self, state):
+        idx = self.state_index.get(state)
+        if idx is None:
+            idx = len(self.state_index)
+            if idx == len(self.q_values):
+                self.q_values = np.vstack([self.q_values, np.zeros_like(self.q_values)])
+            self.state_index[state] = idx
+        return idx
+
+    def _indices(self, states):
+        return np.fromiter((self._index(s) for s in states), dtype=np.int64, count=len(states))
+
+    def _advance(self):
+        self.global_step += 1
+        self.epsilon = self.epsilon_at(self.global_step)
 
     def get_qs(self, state):
-        if state not in self.q_table:
-            self.q_table[state] = np.zeros(self.n_actions)
-        return self.q_table[state]
+        idx = self._index(state)
+        return self.q_values[idx]
 
-    def select_action(self, state):
+    def _mask_bits(self, action_masks):
+        """Integer bitmasks (bit i = action i valid) -> bool array of shape (len(masks), n_actions)."""
+        masks = np.asarray(action_masks, dtype=np.int64)
+        return (masks[:, None] >> np.arange(self.n_actions)) & 1 == 1
+
+    def select_action(self, state, action_mask=None):
+        if action_mask is None:
+            if random.random() < self.epsilon:
+                return random.randint(0, self.n_actions - 1)
+            return int(np.argmax(self.get_qs(state)))
+        valid = [i for i in range(self.n_actions) if action_mask >> i & 1]
         if random.random() < self.epsilon:
-            return random.randint(0, self.n_actions - 1)
-        return int(np.argmax(self.get_qs(state)))
-
-    def update(self, state, action, reward, next_state):
-        current_q = self.get_qs(state)[action]
-        max_future_q = np.max(self.get_qs(next_state))
-        new_q = (1 - self.lr) * current_q + self.lr * (reward + self.gamma * max_future_q)
-        self.q_table[state][action] = new_q
-        self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
+            return random.choice(valid)
+        qs = self.get_qs(state)
+        return max(valid, key=lambda i: qs[i])
+
+    def update(self, state, action, reward, next_state, next_action_mask=None):
+        s, s_next = self._index(state), self._index(next_state)
+        current_q = self.q_values[s, action]
+        if next_action_mask is None:
+            max_future_q = np.max(self.q_values[s_next])
+        else:
+            # bootstrap only over actions that can be picked in next_state; invalid ones stay at 0 forever
+            max_future_q = max(self.q_values[s_next, i] for i in range(self.n_actions) if next_action_mask >> i & 1)
+        self.q_values[s, action] = (1 - self.lr) * current_q + self.lr * (reward + self.gamma * max_future_q)
+        self._advance()
+
+    def select_actions(self, states, action_masks=None):
+        """Epsilon-greedy actions for a batch of states (one per parallel env), optionally restricted by bitmasks."""
+        idx = self._indices(states)
+        qs = self.q_values[idx]
+        explore = self.rng.random(len(idx)) < self.epsilon
+        if action_masks is None:
+            return np.where(explore, self.rng.integers(0, self.n_actions, size=len(idx)), np.argmax(qs, axis=1))
+        valid = self._mask_bits(action_masks)
+        greedy = np.argmax(np.where(valid, qs, -np.inf), axis=1)
+        # uniform over valid actions: argmax of random scores with invalid ones pushed below zero
+        random_valid = np.argmax(np.where(valid, self.rng.random(valid.shape), -1.0), axis=1)
+        return np.where(explore, random_valid, greedy)
+
+    def _td_update(self, s, a, r, s_next, next_masks):
+        future_q = np.where(self._mask_bits(next_masks), self.q_values[s_next], -np.inf).max(axis=1)
+        td_errors = r + self.gamma * future_q - self.q_values[s, a]
+        # repeated (state, action) pairs in one batch get their mean TD error, so lr stays the step size for any K
+        pairs, inverse = np.unique(s * self.n_actions + a, return_inverse=True)
+        mean_errors = np.bincount(inverse, weights=td_errors) / np.bincount(inverse)
+        self.q_values[pairs // self.n_actions, pairs % self.n_actions] += self.lr * mean_errors
+
+    def update_batch(self, states, actions, rewards, next_states, next_action_masks=None):
+        """One Q-learning step over transitions from K parallel envs, plus a replay batch if enabled.
+
+        next_action_masks restricts the bootstrap max to the actions valid in each next state.
+        """
+        s = self._indices(states)
+        s_next = self._indices(next_states)
+        a = np.asarray(actions, dtype=np.int64)
+        r = np.asarray(rewards, dtype=np.float64)
+        masks = np.full(len(s), -1, dtype=np.int64) if next_action_masks is None else np.asarray(next_action_masks, dtype=np.int64)
+        self._td_update(s, a, r, s_next, masks)
+        if self.replay is not None:
+            self.replay.add_batch(s, a, r, s_next, masks)
+            if len(self.replay) >= self.replay_batch_size:
+                self._td_update(*self.replay.sample(self.replay_batch_size))
+        self._advance()
@@ -0,0 +1,173 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from pathlib import Path
+from urllib.parse import urlparse
+
+from report import base_log_dir, output_dir, hash_response, discover_logs
+
+CORPUS_FILE = "crash_corpus.jsonl"
+RESULTS_FILE = "replay_results.csv"
+
+def _is_auth_header(name, value):
+    # mutate_headers copies headers as "<name>_fuzz", so Authorization_fuzz etc. carry the token too
+    return name.lower().startswith("authorization") or (isinstance(value, str) and value.lower().startswith("bearer "))
+
+def _without_auth(request):
+    """Copy of `request` without credential headers, plus whether any were removed.
+
+    Logged bearer tokens must not end up in the corpus, and the configured token is attached at replay time
+    (perform_request keeps an existing Authorization header).
+    """
+    request = dict(request)
+    headers = request.get("headers")
+    if not isinstance(headers, dict):
+        return request, False
+    request["headers"] = {k: v for k, v in headers.items() if not _is_auth_header(k, v)}
+    return request, len(request["headers"]) != len(headers)
+
+def _request_key(request):
+    return json.dumps([request.get("method", "GET").upper(), request.get("url"), request.get("headers") or {},
+                       request.get("body")], sort_keys=True, default=str)
+
+def extract_crashes(path):
+    """(key, crash) for every 5xx line of one run_*.jsonl; lines are pre-filtered before JSON parsing."""
+    crashes = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if '"status_code": 5' not in line:
+                continue
+            try:
+                entry = json.loads(line.strip())
+            except json.JSONDecodeError:
+                continue
+            status = entry.get("status_code") or 0
+            request = entry.get("mutated_request")
+            if status < 500 or not isinstance(request, dict):
+                continue
+            request, authenticated = _without_auth(request)
+            original = entry.get("original_request")
+            endpoint = original.get("endpoint") if isinstance(original, dict) else None
+            crashes.append((_request_key(request), {
+                "request": request,
+                "status_code": status,
+                "response_hash": hash_response(entry.get("response_text", "")),
+                "bug_id": f"{endpoint}|{status}|{hash_response(entry.get('response_text', ''))}",
+                "action_name": entry.get("action_name"),
+                "authenticated": authenticated,
+                "source": str(path)
+            }))
+    return crashes
+
+def build_corpus(log_root=base_log_dir, api_name=None, mode=None, workers=None):
+    """Unique crashing requests from experiment_logs, each with the number of times it was logged."""
+    paths = [p for (api, m), files in discover_logs(log_root).items()
+             if (api_name is None or api == api_name) and (mode is None or m == mode) for p in files]
+    corpus = {}
+    if not paths:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for crashes in pool.map(extract_crashes, paths, chunksize=8):
+            for key, crash in crashes:
+                if key in corpus:
+                    corpus[key]["occurrences"] += 1
+                else:
+                    crash["occurrences"] = 1
+                    corpus[key] = crash
+    return list(corpus.values())
+
+def _rebase(url, target):
+    if not target or not url:
+        return url
+    new_base = urlparse(target)
+    return urlparse(url)._replace(scheme=new_base.scheme, netloc=new_base.netloc).geturl()
+
+def classify(crash, status, response_text):
+    if status == 0:
+        return "error"
+    if status in (401, 403):
+        return "auth_failed"  # the request never reached the code that crashed, so it proves nothing
+    if status < 500:
+        return "fixed"
+    if status != crash["status_code"]:
+        return "changed_status"
+    return "reproduced" if hash_response(response_text) == crash["response_hash"] else "reproduced_changed_body"
+
+def make_session(pool_size):
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))  # no cookie state leaking between replays
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def replay_corpus(corpus, target=None, token=None, workers=32, timeout=10):
+    from api_fuzz_env import perform_request
+    session = make_session(workers)
+
+    def replay_one(crash):
+        request, _ = _without_auth(json.loads(json.dumps(crash["request"])))
+        request["url"] = _rebase(request.get("url"), target)
+        response = perform_request(request, token, session, timeout)
+        status = response.status_code or 0
+        return {
+            "bug_id": crash["bug_id"],
+            "method": request.get("method", "GET"),
+            "url": request.get("url"),
+            "action_name": crash["action_name"],
+            "occurrences": crash["occurrences"],
+            "logged_status": crash["status_code"],
+            "replay_status": status,
+            "outcome": classify(crash, status, response.text)
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(replay_one, corpus))
+
+def run_replay(log_root=base_log_dir, output_root=output_dir, api_name=None, mode=None, target=None, token=None,
+               workers=32, timeout=10):
+    output_root = Path(output_root)
+    os.makedirs(output_root, exist_ok=True)
+
+    start = time.perf_counter()
+    corpus = build_corpus(log_root, api_name, mode)
+    if not corpus:
+        print(f"No 5xx requests found under {log_root}")
+        return []
+    with open(output_root / CORPUS_FILE, "w", encoding="utf-8") as f:
+        for crash in corpus:
+            f.write(json.dumps(crash) + "\n")
+    print(f"Extracted {len(corpus)} unique crashing requests in {time.perf_counter() - start:.2f}s")
+
+    token = token or os.environ.get("FUZZ_API_TOKEN")
+    authenticated = sum(1 for crash in corpus if crash.get("authenticated"))
+    if authenticated and not token:
+        print(f"⚠️ WARNING: {authenticated} crashing request(s) were logged with credentials but no replay token "
+              f"is configured (replay.token / FUZZ_API_TOKEN); they will be sent unauthenticated and "
+              f"401/403 answers are reported as auth_failed, not fixed.")
+
+    start = time.perf_counter()
+    results = replay_corpus(corpus, target, token, workers, timeout)
+    elapsed = time.perf_counter() - start
+
+    with open(output_root / RESULTS_FILE, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+    outcomes = {}
+    for result in results:
+        outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+    print(f"Replayed {len(results)} requests in {elapsed:.2f}s ({len(results) / elapsed:,.0f}/s)")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome}: {count}")
+    print(f"Results saved in: {output_root / RESULTS_FILE}")
+    return results
+
+if __name__ == "__main__":
+    run_replay()
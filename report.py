@@ -0,0 +1,379 @@
+import csv
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+base_log_dir = Path("./experiment_logs")
+output_dir = Path("./analysis_output")
+CACHE_FILE = ".report_cache.json"
+CACHE_VERSION = 1
+MODES = ["classic", "heuristic", "rl"]
+
+# Per-run_*.jsonl aggregates are plain JSON (sets stored as sorted lists) so they can be cached
+# and merged without re-reading the logs; only new or changed files are parsed again.
+
+def hash_response(text):
+    if not text:
+        return "empty"
+    return hashlib.md5(text.encode("utf-8", errors="ignore")).hexdigest()
+
+def _add_stat(stats, key, value):
+    entry = stats.setdefault(key, [0, 0.0, 0.0])  # count, sum, sum of squares
+    entry[0] += 1
+    entry[1] += value
+    entry[2] += value * value
+
+def aggregate_file(path):
+    requests = 0
+    reward_sum = reward_sq_sum = 0.0
+    status_counts = {}
+    endpoints, mutators, paths, bugs = set(), set(), set(), set()
+    first_5xx_episode = {}
+    requests_to_first_5xx = None
+    by_mutator, by_type = {}, {}
+    errors_by_type, errors_by_endpoint = {}, {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line.strip())
+            except json.JSONDecodeError:
+                continue
+            requests += 1
+            original = entry.get("original_request")
+            mutated = entry.get("mutated_request")
+            endpoint = original.get("endpoint") if isinstance(original, dict) else None
+            path_tested = mutated.get("path") if isinstance(mutated, dict) else None
+            status = entry.get("status_code") or 0
+            reward = entry.get("reward") or 0
+            action_name = entry.get("action_name")
+            mutation_type = entry.get("mutation_type")
+
+            reward_sum += reward
+            reward_sq_sum += reward * reward
+            status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+            if endpoint is not None:
+                endpoints.add(endpoint)
+            if path_tested is not None:
+                paths.add(path_tested)
+            if action_name is not None:
+                mutators.add(action_name)
+                _add_stat(by_mutator, action_name, reward)
+            if mutation_type is not None:
+                _add_stat(by_type, mutation_type, reward)
+
+            if status >= 500:
+                if mutation_type is not None:
+                    errors_by_type[mutation_type] = errors_by_type.get(mutation_type, 0) + 1
+                if endpoint is not None:
+                    errors_by_endpoint[endpoint] = errors_by_endpoint.get(endpoint, 0) + 1
+                if entry.get("response_diff"):
+                    bugs.add(f"{endpoint}|{status}|{hash_response(entry.get('response_text', ''))}")
+                if requests_to_first_5xx is None:
+                    requests_to_first_5xx = requests
+                if "run" in entry and "episode" in entry:
+                    run = str(entry["run"])
+                    episode = entry["episode"]
+                    if run not in first_5xx_episode or episode < first_5xx_episode[run]:
+                        first_5xx_episode[run] = episode
+
+    return {
+        "requests": requests,
+        "reward_sum": reward_sum,
+        "reward_sq_sum": reward_sq_sum,
+        "status_counts": status_counts,
+        "endpoints": sorted(endpoints),
+        "mutators": sorted(mutators),
+        "paths": sorted(paths),
+        "bugs": sorted(bugs),
+        "first_5xx_episode": first_5xx_episode,
+        "requests_to_first_5xx": requests_to_first_5xx,
+        "by_mutator": by_mutator,
+        "by_type": by_type,
+        "errors_by_type": errors_by_type,
+        "errors_by_endpoint": errors_by_endpoint
+    }
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+def save_cache(cache_path, files):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f)
+    os.replace(tmp_path, cache_path)
+
+def discover_logs(log_root):
+    """Returns {(api_name, mode): [run_*.jsonl paths]} for the experiment_logs/<api>/<mode>/ layout."""
+    groups = {}
+    log_root = Path(log_root)
+    if not log_root.exists():
+        return groups
+    for mode_dir in sorted(log_root.glob("*/*")):
+        if not mode_dir.is_dir():
+            continue
+        files = sorted(str(p) for p in mode_dir.glob("run_*.jsonl"))
+        if files:
+            groups[(mode_dir.parent.name, mode_dir.name)] = files
+    return groups
+
+def collect_aggregates(groups, cache_path, workers=None):
+    """Returns {path: aggregate} for all files in `groups`, re-aggregating only new or changed ones."""
+    cached = load_cache(cache_path)
+    files = {}
+    stale = []
+    for paths in groups.values():
+        for path in paths:
+            st = os.stat(path)
+            key = os.path.abspath(path)
+            entry = cached.get(key)
+            if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+                files[key] = entry
+            else:
+                stale.append((key, st.st_size, st.st_mtime))
+
+    if stale:
+        print(f"Aggregating {len(stale)} new or changed log file(s), {len(files)} cached")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (key, size, mtime), agg in zip(stale, pool.map(aggregate_file, [s[0] for s in stale])):
+                files[key] = {"size": size, "mtime": mtime, "agg": agg}
+    if stale or len(files) != len(cached):
+        save_cache(cache_path, files)
+    return {key: entry["agg"] for key, entry in files.items()}
+
+def _merge_stats(target, stats):
+    for key, (count, total, sq_total) in stats.items():
+        entry = target.setdefault(key, [0, 0.0, 0.0])
+        entry[0] += count
+        entry[1] += total
+        entry[2] += sq_total
+
+def _mean_std(count, total, sq_total):
+    if count == 0:
+        return None, None
+    mean = total / count
+    if count < 2:
+        return mean, None
+    var = max(sq_total - count * mean * mean, 0.0) / (count - 1)
+    return mean, math.sqrt(var)
+
+def merge_aggregates(aggs):
+    merged = {
+        "requests": 0, "reward_sum": 0.0, "reward_sq_sum": 0.0, "status_counts": {},
+        "endpoints": set(), "mutators": set(), "paths": set(), "bugs": set(),
+        "first_5xx_episode": {}, "by_mutator": {}, "by_type": {},
+        "errors_by_type": {}, "errors_by_endpoint": {}
+    }
+    for agg in aggs:
+        merged["requests"] += agg["requests"]
+        merged["reward_sum"] += agg["reward_sum"]
+        merged["reward_sq_sum"] += agg["reward_sq_sum"]
+        for key in ("endpoints", "mutators", "paths", "bugs"):
+            merged[key].update(agg[key])
+        for key in ("status_counts", "errors_by_type", "errors_by_endpoint"):
+            for name, count in agg[key].items():
+                merged[key][name] = merged[key].get(name, 0) + count
+        for run, episode in agg["first_5xx_episode"].items():
+            if run not in merged["first_5xx_episode"] or episode < merged["first_5xx_episode"][run]:
+                merged["first_5xx_episode"][run] = episode
+        _merge_stats(merged["by_mutator"], agg["by_mutator"])
+        _merge_stats(merged["by_type"], agg["by_type"])
+    return merged
+
+def summarize(merged):
+    """Same metrics as analyze_hypothesis' summary.csv, computed from merged aggregates."""
+    statuses = {int(code): count for code, count in merged["status_counts"].items()}
+    avg_reward, reward_std = _mean_std(merged["requests"], merged["reward_sum"], merged["reward_sq_sum"])
+    first_5xx = list(merged["first_5xx_episode"].values())
+    return {
+        "total_requests": merged["requests"],
+        "unique_endpoints": len(merged["endpoints"]),
+        "unique_mutators": len(merged["mutators"]),
+        "avg_reward": avg_reward,
+        "reward_std": reward_std,
+        "total_5xx": sum(c for code, c in statuses.items() if code >= 500),
+        "total_4xx": sum(c for code, c in statuses.items() if 400 <= code < 500),
+        "total_2xx": sum(c for code, c in statuses.items() if 200 <= code < 300),
+        "unique_status_codes": len(statuses),
+        "unique_paths_tested": len(merged["paths"]),
+        "unique_bugs_found": len(merged["bugs"]),
+        "avg_episode_to_first_5xx": sum(first_5xx) / len(first_5xx) if first_5xx else None,
+        "runs_with_5xx": len(first_5xx)
+    }
+
+def _stat_means(stats):
+    means = {name: _mean_std(*entry)[0] for name, entry in stats.items()}
+    return dict(sorted(means.items(), key=lambda kv: kv[1]))
+
+### CHARTS (run in worker processes; arguments are plain data so they pickle cheaply)
+def _figure(figsize=None):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=figsize)
+    return plt, fig, ax
+
+def _save(plt, fig, out_path):
+    fig.tight_layout()
+    fig.savefig(out_path)
+    plt.close(fig)
+    return out_path
+
+def render_line(values, title, xlabel, ylabel, out_path):
+    plt, fig, ax = _figure()
+    ax.plot(list(values.keys()), list(values.values()), marker="o")
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(True)
+    return _save(plt, fig, out_path)
+
+def render_bar(values, title, xlabel, ylabel, out_path, horizontal=False):
+    plt, fig, ax = _figure(figsize=(10, 6))
+    names, heights = list(values.keys()), list(values.values())
+    if horizontal:
+        ax.barh(names, heights)
+    else:
+        ax.bar(names, heights)
+        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return _save(plt, fig, out_path)
+
+def render_grouped_bar(series, title, ylabel, out_path):
+    """series: {mode: {category: value}} drawn side by side per category."""
+    plt, fig, ax = _figure(figsize=(12, 6))
+    categories = sorted({c for values in series.values() for c in values})
+    width = 0.8 / max(len(series), 1)
+    for i, (mode, values) in enumerate(series.items()):
+        xs = [j + i * width for j in range(len(categories))]
+        ax.bar(xs, [values.get(c) or 0 for c in categories], width=width, label=mode)
+    ax.set_xticks([j + width * (len(series) - 1) / 2 for j in range(len(categories))])
+    ax.set_xticklabels(categories, rotation=45, ha="right")
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.legend()
+    return _save(plt, fig, out_path)
+
+def chart_tasks(api_name, mode, merged, output_path):
+    first_5xx = {int(run): ep for run, ep in merged["first_5xx_episode"].items()}
+    top_endpoints = sorted(merged["errors_by_endpoint"].items(), key=lambda kv: kv[1], reverse=True)[:10]
+    return [
+        (render_line, (dict(sorted(first_5xx.items())), "Episode to first 5xx error (per run)", "Run ID", "Episode",
+                       str(output_path / "episode_to_first_5xx.png"))),
+        (render_bar, (_stat_means(merged["by_type"]), "Average reward per mutation type", "Average reward",
+                      "Mutation type", str(output_path / "reward_per_mutation_type.png"), True)),
+        (render_bar, (merged["errors_by_type"], "Amount of server errors (5XX) per mutation type", "",
+                      "5XX errors summary", str(output_path / "errors_per_mutation_type.png"))),
+        (render_bar, (_stat_means(merged["by_mutator"]), "Average reward per mutation operator", "Average reward",
+                      "Operator", str(output_path / "reward_per_mutator.png"), True)),
+        (render_bar, (dict(top_endpoints), "Most failing endpoints (5xx)", "", "Amount of 5XX errors",
+                      str(output_path / "errors_per_endpoint.png")))
+    ]
+
+def comparison_tasks(api_name, by_mode, output_path):
+    summaries = {mode: summarize(merged) for mode, merged in by_mode.items()}
+    metrics = ["unique_bugs_found", "total_5xx", "avg_episode_to_first_5xx", "runs_with_5xx"]
+    return [
+        (render_grouped_bar, ({mode: {m: s[m] for m in metrics} for mode, s in summaries.items()},
+                              f"{api_name}: classic vs heuristic vs rl", "Value",
+                              str(output_path / "comparison_summary.png"))),
+        (render_grouped_bar, ({mode: _stat_means(merged["by_type"]) for mode, merged in by_mode.items()},
+                              f"{api_name}: average reward per mutation type", "Average reward",
+                              str(output_path / "comparison_reward_per_mutation_type.png"))),
+        (render_grouped_bar, ({mode: merged["errors_by_type"] for mode, merged in by_mode.items()},
+                              f"{api_name}: 5XX errors per mutation type", "5XX errors",
+                              str(output_path / "comparison_errors_per_mutation_type.png")))
+    ]
+
+def _mode_order(mode):
+    return (MODES.index(mode) if mode in MODES else len(MODES), mode)
+
+RENDER_FINGERPRINT = ".render_fingerprint.json"
+
+def _fingerprint(paths):
+    """Sorted (path, size, mtime) of the logs a set of charts is drawn from."""
+    return sorted([os.path.abspath(p), os.stat(p).st_size, os.stat(p).st_mtime] for p in paths)
+
+def _up_to_date(tasks, chart_dir, fingerprint):
+    # compared against what the charts in chart_dir were last drawn from, independently of the aggregate
+    # cache, which `stats` also refreshes
+    try:
+        with open(chart_dir / RENDER_FINGERPRINT, "r", encoding="utf-8") as f:
+            if json.load(f) != fingerprint:
+                return False
+    except (OSError, json.JSONDecodeError):
+        return False
+    return all(os.path.exists(arg) for _, args in tasks for arg in args if str(arg).endswith(".png"))
+
+def build_report(log_root=base_log_dir, output_root=output_dir, workers=None):
+    output_root = Path(output_root)
+    groups = discover_logs(log_root)
+    if not groups:
+        print(f"No run_*.jsonl logs found under {log_root}")
+        return []
+
+    aggs = collect_aggregates(groups, str(output_root / CACHE_FILE), workers)
+    merged = {group: merge_aggregates(aggs[os.path.abspath(p)] for p in paths) for group, paths in groups.items()}
+
+    rows = []
+    tasks = []
+    fingerprints = []  # (chart dir, fingerprint) written once the charts are rendered
+    skipped = 0
+    apis = sorted({api for api, _ in merged})
+    for api_name in apis:
+        modes = sorted((mode for api, mode in merged if api == api_name), key=_mode_order)
+        by_mode = {mode: merged[(api_name, mode)] for mode in modes}
+        api_fingerprint = {}
+        for mode, group in by_mode.items():
+            output_path = output_root / api_name / mode
+            os.makedirs(output_path, exist_ok=True)
+            rows.append({"api": api_name, "mode": mode, "log_files": len(groups[(api_name, mode)]), **summarize(group)})
+            # charts are only redrawn when their input logs differ from the last render or a PNG is missing
+            fingerprint = _fingerprint(groups[(api_name, mode)])
+            api_fingerprint[mode] = fingerprint
+            group_tasks = chart_tasks(api_name, mode, group, output_path)
+            if _up_to_date(group_tasks, output_path, fingerprint):
+                skipped += len(group_tasks)
+            else:
+                tasks.extend(group_tasks)
+                fingerprints.append((output_path, fingerprint))
+        api_tasks = comparison_tasks(api_name, by_mode, output_root / api_name)
+        if _up_to_date(api_tasks, output_root / api_name, api_fingerprint):
+            skipped += len(api_tasks)
+        else:
+            tasks.extend(api_tasks)
+            fingerprints.append((output_root / api_name, api_fingerprint))
+
+    summary_path = output_root / "summary_all.csv"
+    with open(summary_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fn, *args) for fn, args in tasks]
+            for future in futures:
+                future.result()
+    for chart_dir, fingerprint in fingerprints:
+        with open(chart_dir / RENDER_FINGERPRINT, "w", encoding="utf-8") as f:
+            json.dump(fingerprint, f)
+
+    print(f"Rendered {len(tasks)} charts ({skipped} up to date); combined summary saved in: {summary_path}")
+    return rows
+
+if __name__ == "__main__":
+    build_report()
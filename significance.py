@@ -0,0 +1,123 @@
+import csv
+import math
+import os
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+from report import base_log_dir, output_dir, CACHE_FILE, MODES, discover_logs, collect_aggregates
+
+METRICS = ["unique_bugs", "requests_to_first_5xx", "rate_5xx"]
+# for requests_to_first_5xx lower is better; runs without any 5xx are censored at their request count
+_MAX_RESAMPLE_CELLS = 5_000_000  # bounds memory of one resample batch (rows * sample size)
+
+def run_metrics(agg):
+    """Per-run metrics from one run_*.jsonl aggregate (see report.aggregate_file)."""
+    total_5xx = sum(c for code, c in agg["status_counts"].items() if int(code) >= 500)
+    first = agg["requests_to_first_5xx"]
+    return {
+        "unique_bugs": len(agg["bugs"]),
+        "requests_to_first_5xx": first if first is not None else agg["requests"],
+        "rate_5xx": total_5xx / agg["requests"] if agg["requests"] else 0.0
+    }
+
+def _resampled_means(values, n_resamples, rng):
+    n = len(values)
+    batch = max(1, _MAX_RESAMPLE_CELLS // n)
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = values[idx].mean(axis=1)
+    return means
+
+def bootstrap_diff(a, b, n_resamples=20000, alpha=0.05, rng=None):
+    """Bootstrap of mean(b) - mean(a); returns (ci_low, ci_high, two-sided p-value)."""
+    rng = rng if rng is not None else np.random.default_rng()
+    diffs = _resampled_means(b, n_resamples, rng) - _resampled_means(a, n_resamples, rng)
+    ci_low, ci_high = np.quantile(diffs, [alpha / 2, 1 - alpha / 2])
+    p_value = min(1.0, 2 * min(np.mean(diffs <= 0), np.mean(diffs >= 0)))
+    return float(ci_low), float(ci_high), float(p_value)
+
+def mann_whitney_u(a, b):
+    """U statistic of b vs a and two-sided p-value (normal approximation with tie and continuity correction)."""
+    n1, n2 = len(a), len(b)
+    values = np.concatenate([a, b])
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    ranks = ((ends - counts + 1 + ends) / 2)[inverse]
+    u = ranks[n1:].sum() - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    tie_term = np.sum(counts ** 3 - counts) / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return float(u), 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / sigma
+    return float(u), min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+def cliffs_delta(u, n1, n2):
+    return 2 * u / (n1 * n2) - 1
+
+def cohens_d(a, b):
+    pooled = ((len(a) - 1) * a.var(ddof=1) + (len(b) - 1) * b.var(ddof=1)) / (len(a) + len(b) - 2)
+    if pooled == 0:
+        return 0.0
+    return float((b.mean() - a.mean()) / math.sqrt(pooled))
+
+def compare(a, b, n_resamples=20000, alpha=0.05, rng=None):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    ci_low, ci_high, p_bootstrap = bootstrap_diff(a, b, n_resamples, alpha, rng)
+    u, p_mw = mann_whitney_u(a, b)
+    return {
+        "n_a": len(a),
+        "n_b": len(b),
+        "mean_a": float(a.mean()),
+        "mean_b": float(b.mean()),
+        "diff": float(b.mean() - a.mean()),
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "p_bootstrap": p_bootstrap,
+        "u": u,
+        "p_mann_whitney": p_mw,
+        "cliffs_delta": cliffs_delta(u, len(a), len(b)),
+        "cohens_d": cohens_d(a, b)
+    }
+
+def run_significance(log_root=base_log_dir, output_root=output_dir, n_resamples=20000, alpha=0.05, seed=None, workers=None):
+    output_root = Path(output_root)
+    groups = discover_logs(log_root)
+    if not groups:
+        print(f"No run_*.jsonl logs found under {log_root}")
+        return []
+
+    aggs = collect_aggregates(groups, str(output_root / CACHE_FILE), workers)
+    per_run = {group: [run_metrics(aggs[os.path.abspath(p)]) for p in paths] for group, paths in groups.items()}
+    rng = np.random.default_rng(seed)
+
+    rows = []
+    for api_name in sorted({api for api, _ in per_run}):
+        modes = [m for m in MODES if (api_name, m) in per_run]
+        modes += sorted(m for api, m in per_run if api == api_name and m not in MODES)
+        for mode_a, mode_b in combinations(modes, 2):
+            runs_a, runs_b = per_run[(api_name, mode_a)], per_run[(api_name, mode_b)]
+            if len(runs_a) < 2 or len(runs_b) < 2:
+                print(f"Skipping {api_name} {mode_a} vs {mode_b}: need at least 2 runs per mode")
+                continue
+            for metric in METRICS:
+                result = compare([r[metric] for r in runs_a], [r[metric] for r in runs_b], n_resamples, alpha, rng)
+                rows.append({"api": api_name, "metric": metric, "mode_a": mode_a, "mode_b": mode_b, **result})
+
+    if not rows:
+        return rows
+    os.makedirs(output_root, exist_ok=True)
+    out_path = output_root / "significance.csv"
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(rows)} comparisons ({n_resamples} bootstrap resamples each) saved in: {out_path}")
+    return rows
+
+if __name__ == "__main__":
+    run_significance()